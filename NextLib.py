@@ -1,4 +1,5 @@
-import random
+import random  # Conservé pour les scripts d'activité exécutés dans le même espace de noms
+from random import choice as _randChoice, randrange as _randRange
 from typing import Optional, Union, Iterable, Callable
 
 
@@ -12,6 +13,25 @@ class InvalidExerciseError(Exception):
     pass
 
 
+def _requireGroup(groupNb: Optional[int]) -> list:
+    """
+    Vérifie qu'un numéro de groupe est valide et renvoie les exercices de ce groupe.
+
+    Args:
+        groupNb (Optional[int]): Le numéro du groupe (index).
+
+    Returns:
+        list: La liste des exercices du groupe.
+
+    Raises:
+        InvalidGroupError: Si le numéro de groupe est invalide.
+    """
+    if groupNb is None or not 0 <= groupNb < len(exerciseGroups):
+        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
+
+    return exerciseGroups[str(groupNb)]["exercises"]
+
+
 def playExercise(exerciseId: str) -> None:
     """
     Démarre l'exécution d'un exercice en fonction de son ID.
@@ -54,10 +74,7 @@ def getExerciseId(groupNb: int = 0, exerciseNb: int = 0) -> str:
         InvalidGroupError: Si le numéro de groupe est invalide.
         InvalidExerciseError: Si le numéro d'exercice est invalide.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-
-    exercises = exerciseGroups[str(groupNb)]["exercises"]
+    exercises = _requireGroup(groupNb)
     
     if exerciseNb < 0 or exerciseNb >= len(exercises):
         raise InvalidExerciseError(f"Le numéro d'exercice {exerciseNb} est invalide.")
@@ -101,10 +118,7 @@ def getGroupExercisesCount(groupNb: int) -> int:
     Raises:
         InvalidGroupError: Si le numéro de groupe spécifié n'existe pas.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-
-    return len(exerciseGroups[str(groupNb)]["exercises"])
+    return len(_requireGroup(groupNb))
 
 
 def getLastPlayedExerciseId() -> Optional[str]:
@@ -114,9 +128,10 @@ def getLastPlayedExerciseId() -> Optional[str]:
     Returns:
         Optional[str]: L'ID du dernier exercice joué, ou None si aucun exercice n'a été joué.
     """
-    if not navigation.get("current"):
+    try:
+        return navigation["current"]["id"]
+    except (KeyError, TypeError):
         return None
-    return navigation["current"]["id"]
 
 
 def isAllExercisesPlayed() -> bool:
@@ -139,7 +154,7 @@ def getRandomGroupNb() -> int:
     Returns:
         int: Un numéro de groupe choisi aléatoirement (index).
     """
-    return random.randint(0, getGroupsCount() - 1)
+    return _randRange(len(exerciseGroups))
 
 
 def getRandomGroupExerciseNb(groupNb: int) -> int:
@@ -155,10 +170,7 @@ def getRandomGroupExerciseNb(groupNb: int) -> int:
     Raises:
         InvalidGroupError: Si le numéro de groupe spécifié n'existe pas.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-
-    return random.randint(0, getGroupExercisesCount(groupNb) - 1)
+    return _randRange(len(_requireGroup(groupNb)))
 
 
 def getRandomExercise() -> str:
@@ -168,9 +180,8 @@ def getRandomExercise() -> str:
     Returns:
         str: L'ID de l'exercice choisi aléatoirement.
     """
-    groupNb = getRandomGroupNb()
-    exerciseNb = getRandomGroupExerciseNb(groupNb)
-    return getExerciseId(groupNb, exerciseNb)
+    exercises = exerciseGroups[str(_randRange(len(exerciseGroups)))]["exercises"]
+    return exercises[_randRange(len(exercises))]["id"]
 
 
 def getRandomExerciseFromGroup(groupNb: int) -> str:
@@ -186,10 +197,8 @@ def getRandomExerciseFromGroup(groupNb: int) -> str:
     Raises:
         InvalidGroupError: Si le numéro de groupe spécifié n'existe pas.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-    
-    return getExerciseId(groupNb, getRandomGroupExerciseNb(groupNb))
+    exercises = _requireGroup(groupNb)
+    return exercises[_randRange(len(exercises))]["id"]
 
 
 def getRandomUnplayedExerciseId() -> Optional[str]:
@@ -204,7 +213,7 @@ def getRandomUnplayedExerciseId() -> Optional[str]:
     if not unplayed_exercises:
         return None
     
-    return random.choice(unplayed_exercises)
+    return _randChoice(unplayed_exercises)
 
 
 def playCurrentIfUnplayed() -> None:
@@ -214,7 +223,7 @@ def playCurrentIfUnplayed() -> None:
     Si l'exercice actuel a déjà été tenté, aucune action n'est effectuée.
     """
     current = getLastPlayedExerciseId()
-    if current and getExerciseAttempts(current) == 0:
+    if current and exercisesMeta[current]["attempts"] == 0:
         playExercise(current)
 
 
@@ -241,7 +250,7 @@ def getExerciseLastGrade(exerciseId: str) -> Optional[int]:
     Returns:
         Optional[int]: La dernière note attribuée à l'exercice, ou None si l'exercice n'a pas encore été noté.
     """
-    grades = getExerciseGrades(exerciseId)
+    grades = exercisesMeta[exerciseId]["grades"]
     return grades[-1] if grades else None
 
 
@@ -255,7 +264,7 @@ def getExerciseBestGrade(exerciseId: str) -> Optional[int]:
     Returns:
         Optional[int]: La meilleure note attribuée à l'exercice, ou None si l'exercice n'a pas encore été noté.
     """
-    grades = getExerciseGrades(exerciseId)
+    grades = exercisesMeta[exerciseId]["grades"]
     return max(grades) if grades else None
 
 
@@ -266,7 +275,10 @@ def getCurrentGrade() -> Optional[int]:
     Returns:
         Optional[int]: La note de l'exercice actuellement joué, ou None s'il n'y a pas de note.
     """
-    return navigation.get("current", {}).get("grade")
+    try:
+        return navigation["current"]["grade"]
+    except (KeyError, TypeError):
+        return None
 
 
 def isPlayed(exerciseId: str) -> bool:
@@ -279,7 +291,7 @@ def isPlayed(exerciseId: str) -> bool:
     Returns:
         bool: True si l'exercice a été joué au moins une fois, False sinon.
     """
-    return getExerciseAttempts(exerciseId) > 0
+    return exercisesMeta[exerciseId]["attempts"] > 0
 
 
 def playAnyFromGroup(groupNb: int) -> Optional[None]:
@@ -296,17 +308,11 @@ def playAnyFromGroup(groupNb: int) -> Optional[None]:
     Raises:
         InvalidGroupError: Si le numéro de groupe spécifié n'existe pas.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-
-    exercises = exerciseGroups[str(groupNb)]["exercises"]
-    
-    for exercise in exercises:
-        if isPlayed(exercise["id"]):
-            return None 
+    exercises = _requireGroup(groupNb)
+    if any(exercisesMeta[exercise["id"]]["attempts"] > 0 for exercise in exercises):
+        return None
 
-    randomExerciseNb = getRandomGroupExerciseNb(groupNb)
-    playExercise(exercises[randomExerciseNb]["id"])
+    playExercise(exercises[_randRange(len(exercises))]["id"])
 
 
 def playAllFromGroup(groupNb: int, randomOrder: bool = False) -> Optional[None]:
@@ -326,20 +332,18 @@ def playAllFromGroup(groupNb: int, randomOrder: bool = False) -> Optional[None]:
     Raises:
         InvalidGroupError: Si le numéro de groupe spécifié n'existe pas.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-
-    exercises = exerciseGroups[str(groupNb)]["exercises"]
-    
-    unplayed_exercises = [exercise for exercise in exercises if not isPlayed(exercise["id"])]
-    
-    if not unplayed_exercises:
-        return None 
+    exercises = _requireGroup(groupNb)
 
     if randomOrder:
-        playExercise(random.choice(unplayed_exercises)["id"])
+        unplayed_exercises = [exercise for exercise in exercises if exercisesMeta[exercise["id"]]["attempts"] == 0]
+        if not unplayed_exercises:
+            return None
+        playExercise(_randChoice(unplayed_exercises)["id"])
     else:
-        playExercise(unplayed_exercises[0]["id"])
+        for exercise in exercises:
+            if exercisesMeta[exercise["id"]]["attempts"] == 0:
+                playExercise(exercise["id"])
+                return None
 
 
 def playFirstUnplayedExercise() -> None:
@@ -351,11 +355,12 @@ def playFirstUnplayedExercise() -> None:
         Optional[str]: L'ID du prochain exercice non joué, ou None si tous les exercices
                        ont été joués.
     """
-    for groupNb in range(getGroupsCount()):
+    for groupNb in range(len(exerciseGroups)):
         exercises = exerciseGroups[str(groupNb)]["exercises"]
         for exercise in exercises:
-            if not isPlayed(exercise["id"]):
+            if exercisesMeta[exercise["id"]]["attempts"] == 0:
                 playExercise(exercise["id"])
+                return
 
 
 def playNextUnplayedExercise(loop: bool = False) -> None:
@@ -367,25 +372,26 @@ def playNextUnplayedExercise(loop: bool = False) -> None:
     Raises:
         StopExec: Exception levée pour démarrer le prochain exercice non joué.
     """
-    current_id = navigation.get("current", {}).get("id")
+    current_id = getLastPlayedExerciseId()
     found_current = False
+    first_unplayed_id = None
 
-    # Parcourt tous les groupes et exercices en cherchant le prochain exercice non joué après le current
-    for groupNb in range(getGroupsCount()):
+    # Parcourt les exercices une seule fois : joue le premier exercice non joué suivant le current
+    # et, si loop, retient au passage le premier exercice non joué jusqu'au current inclus
+    for groupNb in range(len(exerciseGroups)):
         exercises = exerciseGroups[str(groupNb)]["exercises"]
         for exercise in exercises:
-            if found_current and not isPlayed(exercise["id"]):
-                playExercise(exercise["id"])
+            if (found_current or (loop and first_unplayed_id is None)) and exercisesMeta[exercise["id"]]["attempts"] == 0:
+                if found_current:
+                    playExercise(exercise["id"])
+                    return
+                first_unplayed_id = exercise["id"]
             if exercise["id"] == current_id:
                 found_current = True
 
-    # Si aucun exercice suivant n'a été trouvé, recommence depuis le début
-    if (loop):
-        for groupNb in range(getGroupsCount()):
-            exercises = exerciseGroups[str(groupNb)]["exercises"]
-            for exercise in exercises:
-                if not isPlayed(exercise["id"]):
-                    playExercise(exercise["id"])
+    # Si aucun exercice suivant n'a été trouvé, revient au premier exercice non joué
+    if loop and first_unplayed_id is not None:
+        playExercise(first_unplayed_id)
 
 
 def getCurrentGroupNumber() -> Optional[int]:
@@ -396,35 +402,36 @@ def getCurrentGroupNumber() -> Optional[int]:
         Optional[int]: Le numéro du groupe de l'exercice actuel, ou None si aucun exercice
                        n'est en cours.
     """
-    current = navigation.get("current")
-    if not current:
+    current_id = getLastPlayedExerciseId()
+    if current_id is None:
         return None
 
     for groupNb, group in exerciseGroups.items():
-        if any(ex["id"] == current["id"] for ex in group["exercises"]):
+        if any(exercise["id"] == current_id for exercise in group["exercises"]):
             return int(groupNb)
 
     return None
 
 
-def isAllExercisesFromGroupPlayed(groupNb: int = getCurrentGroupNumber()) -> bool:
+def isAllExercisesFromGroupPlayed(groupNb: Optional[int] = None) -> bool:
     """
     Vérifie si tous les exercices d'un groupe spécifique ont été joués.
 
     Args:
-        groupNb (int): Le numéro du groupe (index) à vérifier. Default : current group
+        groupNb (Optional[int]): Le numéro du groupe (index) à vérifier. Default : current group
 
     Returns:
         bool: True si tous les exercices du groupe spécifié ont été joués, False sinon.
     
     Raises:
-        InvalidGroupError: Si le numéro de groupe spécifié n'existe pas.
+        InvalidGroupError: Si le numéro de groupe spécifié n'existe pas, ou si aucun groupe
+                           n'est précisé alors qu'aucun exercice n'est en cours.
     """
-    if groupNb < 0 or groupNb >= getGroupsCount():
-        raise InvalidGroupError(f"Le numéro de groupe {groupNb} est invalide.")
-    
-    exercises = exerciseGroups[str(groupNb)]["exercises"]
-    return all(isPlayed(exercise["id"]) for exercise in exercises)
+    if groupNb is None:
+        groupNb = getCurrentGroupNumber()
+
+    exercises = _requireGroup(groupNb)
+    return all(exercisesMeta[exercise["id"]]["attempts"] > 0 for exercise in exercises)
 
 
 # Grade
@@ -458,19 +465,26 @@ def setActivityGrade(grade_aggregation_strategy: Callable[[], int]) -> None:
 
 def average_grade_strategy() -> int:
     """Stratégie qui retourne la moyenne des notes des exercices joués."""
-    played_grades = [
-        getExerciseLastGrade(ex_id)
-        for ex_id in exercisesMeta if isPlayed(ex_id)
-    ]
-    played_grades = [grade for grade in played_grades if grade is not None]
-    return sum(played_grades) // len(played_grades) if played_grades else 0
+    total = 0
+    count = 0
+    for ex_id, meta in exercisesMeta.items():
+        if meta["attempts"] == 0:
+            continue
+        grade = getExerciseLastGrade(ex_id)
+        if grade is None:
+            continue
+        total += grade
+        count += 1
+    return total // count if count else 0
 
 
 def best_grade_strategy() -> int:
     """Stratégie qui retourne la meilleure note obtenue parmi les exercices joués."""
-    played_grades = [
-        getExerciseLastGrade(ex_id)
-        for ex_id in exercisesMeta if isPlayed(ex_id)
-    ]
-    played_grades = [grade for grade in played_grades if grade is not None]
-    return max(played_grades) if played_grades else 0
+    best = None
+    for ex_id, meta in exercisesMeta.items():
+        if meta["attempts"] == 0:
+            continue
+        grade = getExerciseLastGrade(ex_id)
+        if grade is not None and (best is None or grade > best):
+            best = grade
+    return best if best is not None else 0